@@ -10,7 +10,7 @@ class MyDriverContextManager(DriverContextManager):
         return [self._create_dummy_context_status()]
     
     def _create_dummy_context_status(self) -> ContextStatusSchema:
-        return ContextStatusSchema(
+        return ContextStatusSchema.blank(
             input_data=InputData(search_item='python'),
             output_data=OutputData(),
         )
@@ -1,21 +1,26 @@
 """Package configuration."""
-import pathlib
+import os
+import functools
 import configparser
 
-ROOT_DIR = pathlib.Path(__file__).parents[1]
-CONFIG_DIR = ROOT_DIR / 'config'
-DOWNLOAD_DIR = ROOT_DIR / 'downloads'
-SCREENSHOT_DIR = ROOT_DIR / 'screenshots'
-LOGS_DIR = ROOT_DIR / 'logs'
+# Paths are plain strings so they can be used as they are by os and configparser
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_DIR = os.path.join(ROOT_DIR, 'config')
+DOWNLOAD_DIR = os.path.join(ROOT_DIR, 'downloads')
+SCREENSHOT_DIR = os.path.join(ROOT_DIR, 'screenshots')
+LOGS_DIR = os.path.join(ROOT_DIR, 'logs')
 
+@functools.lru_cache(maxsize=4)
 def get_config( config_file:str = 'config.ini' ) -> configparser.ConfigParser:
     """Get configuration from config.ini file.
+
+    The configuration is cached per config file. Use `reload_config` to reload it.
     
     Returns:
         configparser.ConfigParser: Config file
     """
     # Config file path
-    config_path = ROOT_DIR / config_file
+    config_path = os.path.join(ROOT_DIR, config_file)
     # Config parser
     config = configparser.ConfigParser() 
     # Read config file
@@ -23,12 +28,23 @@ def get_config( config_file:str = 'config.ini' ) -> configparser.ConfigParser:
     # Return config
     return config 
 
+@functools.cache
 def get_download_directory() -> str:
     """Get download directory."""
     config = get_config()
-    return config.get(section='PATHS', option='DOWNLOAD_DIR', fallback=str(DOWNLOAD_DIR))
+    return config.get(section='PATHS', option='DOWNLOAD_DIR', fallback=DOWNLOAD_DIR)
 
+@functools.cache
 def get_screenshot_directory() -> str:
     """Get screenshot directory."""
     config = get_config()
-    return config.get(section='PATHS', option='SCREENSHOT_DIR', fallback=str(SCREENSHOT_DIR))
+    return config.get(section='PATHS', option='SCREENSHOT_DIR', fallback=SCREENSHOT_DIR)
+
+def reload_config() -> None:
+    """Reload the configuration.
+
+    It clears the cached config files and the directories read from them, so the next calls read them again.
+    """
+    get_config.cache_clear()
+    get_download_directory.cache_clear()
+    get_screenshot_directory.cache_clear()
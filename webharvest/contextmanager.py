@@ -3,12 +3,17 @@
 This module contains the driver context manager for the web scrapper. It is the base class for the driver context manager. It populates the producer queue with the input data and handles the data collected by the consumer threads and processes it
 """
 import abc
+import queue
 import logging
 import functools
 import threading
-from typing import List
+from typing import List, Callable, Optional, TYPE_CHECKING
 
-from webharvest.schemas import ContextStatusSchema
+from webharvest.schemas import ContextStatusSchema, ContextStatusEnum
+from webharvest.exceptions import WebScrapperException
+
+if TYPE_CHECKING:
+    from webharvest.driver import DriverContext
 
 class DriverContextManager(abc.ABC):
     """Base class for the driver context manager.
@@ -27,8 +32,11 @@ class DriverContextManager(abc.ABC):
         self.status_contexts: List[ContextStatusSchema] = list()
         """List of status contexts."""
 
-        self.lock = threading.Lock()
-        """Lock for the status contexts list."""
+        self.lock = threading.RLock()
+        """Lock for the status contexts list. Reentrant, so `add_context_status` may acquire it as well."""
+
+        self._live_workers = 0
+        """Number of `run_parallel` workers that have not failed."""
 
     @functools.cached_property
     def logger(self) -> logging.Logger:
@@ -39,6 +47,8 @@ class DriverContextManager(abc.ABC):
     def generate_scraping_contexts(self, *args, **kwargs) -> List[ContextStatusSchema]:
         """Create input data for the producer queue.
 
+        Use `ContextStatusSchema.blank` to create the contexts without validation overhead.
+
         Returns:
             List[ContextStatusSchema]: List of initial contexts.
         """
@@ -63,6 +73,93 @@ class DriverContextManager(abc.ABC):
         raise NotImplementedError(
             "create_process_report method not implemented")
 
+    def run_parallel(self, worker_factory: Callable[[], "DriverContext"], max_workers: int = 1) -> None:
+        """Run the scraping contexts concurrently using a pool of driver contexts.
+
+        The scraping contexts are put in a queue consumed by `max_workers` threads. Each thread creates its own
+        driver context with `worker_factory` (webdrivers are not thread-safe) and runs it until every context
+        has finished. Finished contexts are added with `add_context_status` under the lock.
+
+        Args:
+            worker_factory (Callable[[], DriverContext]): Callable returning a driver context with its initial state set.
+            max_workers (int): Number of worker threads (and webdrivers).
+        """
+        context_queue: queue.Queue[Optional[ContextStatusSchema]] = queue.Queue()
+
+        # Producer - fill the queue and add one sentinel per worker
+        for context_status in self.generate_scraping_contexts():
+            context_queue.put(context_status)
+        for _ in range(max_workers):
+            context_queue.put(None)
+
+        # Workers that have not failed. The last one to fail cancels the remaining contexts
+        self._live_workers = max_workers
+
+        workers = [
+            threading.Thread(target=self._parallel_worker, args=(worker_factory, context_queue), daemon=True)
+            for _ in range(max_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        # Joining the threads (not the queue) also waits for the driver contexts to be cleared
+        for worker in workers:
+            worker.join()
+        self.logger.info(f'Parallel run finished with {max_workers} workers.')
+
+    def _parallel_worker(self, worker_factory: Callable[[], "DriverContext"], context_queue: queue.Queue) -> None:
+        """Consumer loop of `run_parallel`. It runs the queued contexts until the sentinel is received."""
+        driver_context = None
+        try:
+            driver_context = worker_factory()
+            initial_state = driver_context.state.__class__
+
+            while (context_status := context_queue.get()) is not None:
+                try:
+                    driver_context.reset_session()
+                    driver_context.status = context_status
+                    driver_context.set_state(initial_state)
+                    while not driver_context.has_finished():
+                        driver_context.run()
+
+                except WebScrapperException as e:
+                    context_status.error = e
+                    context_status.status = ContextStatusEnum.FAILED
+                    self.logger.error(f'[{context_status.current_state}] {e}')
+
+                except Exception as e:
+                    context_status.error = e
+                    context_status.status = ContextStatusEnum.CRITICAL
+                    self.logger.error(f'[{context_status.current_state}] {e}', exc_info=True)
+
+                finally:
+                    with self.lock:
+                        self.add_context_status(context_status)
+
+        except Exception as e:
+            self.logger.error(f'Error in parallel worker: {e}', exc_info=True)
+            self._parallel_worker_failed(context_queue)
+
+        finally:
+            if driver_context is not None:
+                driver_context.clear_context()
+
+    def _parallel_worker_failed(self, context_queue: queue.Queue) -> None:
+        """Leave the queued contexts to the healthy workers. If no worker is left, they are marked as cancelled."""
+        with self.lock:
+            self._live_workers -= 1
+            if self._live_workers > 0:
+                return
+
+            while True:
+                try:
+                    context_status = context_queue.get_nowait()
+                except queue.Empty:
+                    return
+                if context_status is not None:
+                    context_status.status = ContextStatusEnum.CANCELLED
+                    self.add_context_status(context_status)
+
     def stop_handler(self) -> None:
         """Stop signal handler."""
         self.logger.warning(
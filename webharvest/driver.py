@@ -5,16 +5,13 @@ import random
 import logging
 import threading
 from datetime import datetime
-from functools import cached_property
-from typing import List, Tuple, Optional, Type, Dict, Callable, Generic
-
-import tenacity as tc
-from webdriver_manager.core.manager import DriverManager
+from functools import cached_property, lru_cache
+from typing import List, Tuple, Optional, Type, Dict, Callable, Generic, ClassVar, Iterable, TYPE_CHECKING
 
 # Selenium imports
-from selenium import webdriver
 from selenium.common.exceptions import (
     WebDriverException,
+    InvalidSessionIdException,
     NoSuchElementException,
     StaleElementReferenceException,
     TimeoutException,
@@ -22,21 +19,17 @@ from selenium.common.exceptions import (
 from selenium.webdriver.remote.webelement import WebElement as SeleniumWebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.common.by import By
-
-# Chrome driver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options as ChromeOptions
 
-# Firefox driver
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.firefox import GeckoDriverManager
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
+# Browser specific imports are done where they are used
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from webdriver_manager.core.manager import DriverManager
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.firefox.options import Options as FirefoxOptions
 
 # Own imports
 # from webharvest.captcha import CaptchaSolver  # Disabled for now
-from webharvest import config
+from webharvest import config, utils
 from webharvest.schemas import (
     DriverOptionsSchema,
     DriverTypeEnum,
@@ -47,20 +40,45 @@ from webharvest.schemas import (
     AnyWebDriver,
     OutputDataT,
     InputDataT,
-    TableHeader,
-    TableBody,
 )
 
+# Javascript snippets
+_CLICK_JS = "arguments[0].click();"
+"""Click on an element."""
+
+_SET_ATTR_JS = "arguments[0].setAttribute(arguments[1], arguments[2]);"
+"""Set an attribute of an element."""
+
+_SET_USER_AGENT_JS = "const userAgent = arguments[0]; Object.defineProperty(navigator, 'userAgent', {get: () => userAgent});"
+"""Override the user agent reported by the navigator."""
+
+_TABLE_DATA_JS = """
+const rows = [...arguments[0].querySelectorAll('tr')];
+const header = rows.length ? [...rows[0].querySelectorAll('th')].map(cell => cell.textContent.trim()) : [];
+const body = rows.slice(header.length ? 1 : 0).map(row => [...row.querySelectorAll('td')].map(cell => cell.textContent.trim()));
+return {header: header, body: body};
+"""
+"""Collect the header and body of a table in a single WebDriver call."""
+
+_LIST_DATA_JS = "return [...arguments[0].querySelectorAll('li')].map(item => item.textContent.trim());"
+"""Collect the text of the items of a list in a single WebDriver call."""
+
 
 class DriverState(abc.ABC, Generic[InputDataT, OutputDataT]):
     """Driver state base class. It represents a small sequence of web interactions."""
 
+    RETRY_ARGS: ClassVar[Dict] = {}
+    """Tenacity retry arguments of the state, e.g. `{"stop": tc.stop_after_attempt(3), "wait": tc.wait_fixed(1)}`.
+
+    Pass it to `retry` as `self.retry(function, self.RETRY_ARGS)` so the retrying controller is reused.
+    """
+
     def __init__(self, driver_context: "DriverContext") -> None:
         self.driver_context: DriverContext = driver_context
 
-    @cached_property
+    @property
     def logger(self) -> logging.Logger:
-        """Return the logger"""
+        """Return the logger of the driver context for the current thread"""
         return self.driver_context.logger
 
     @property
@@ -89,10 +107,35 @@ class DriverState(abc.ABC, Generic[InputDataT, OutputDataT]):
         raise NotImplementedError("run method not implemented")
 
     def retry(self, function, retry_args, **kwargs) -> None:
-        return tc.retry(
-            before=tc.before_log(self.driver_context.logger, logging.DEBUG),
-            **retry_args,
-        )(function)(**kwargs)
+        """Call the function with the given keyword arguments, retrying it as set by the tenacity `retry_args`.
+
+        Retrying controllers are cached by their arguments. Tenacity strategies hash by identity, so `retry_args`
+        must be a reused dict, such as `RETRY_ARGS`, to benefit from it. Arguments built inline on every call
+        get a new controller each time.
+        """
+        logger = self.logger
+        try:
+            retrying = self._get_retrying(logger, frozenset(retry_args.items()))
+        except TypeError:
+            # Unhashable retry arguments can't be cached
+            retrying = self._create_retrying(logger, retry_args)
+        return retrying(function, **kwargs)
+
+    @classmethod
+    @lru_cache(maxsize=128)
+    def _get_retrying(cls, logger: logging.Logger, retry_args: frozenset):
+        """Return a cached retrying controller for the logger and retry arguments.
+
+        Loggers are per thread, so a controller is never shared between threads.
+        """
+        return cls._create_retrying(logger, dict(retry_args))
+
+    @staticmethod
+    def _create_retrying(logger: logging.Logger, retry_args: Dict):
+        """Create a tenacity retrying controller"""
+        import tenacity as tc
+
+        return tc.Retrying(before=tc.before_log(logger, logging.DEBUG), **retry_args)
 
     def set_run_status(self, status: ContextStatusEnum) -> None:
         """Set the run status of the context"""
@@ -117,6 +160,15 @@ class DriverContext(abc.ABC):
     RANDOM_AGENTS: List[str]
     """List of random user agents to be used by the driver."""
 
+    CONNECTION_POOL_MAXSIZE: int = 16
+    """Size of the HTTP connection pool used to send commands to the webdriver."""
+
+    _installed_path: ClassVar[Optional[str]] = None
+    """Path of the installed webdriver binary, shared by every context of the same class."""
+
+    _install_lock: ClassVar[threading.Lock] = threading.Lock()
+    """Lock used to install the webdriver binary only once."""
+
     def __init__(
         self, driver_options: DriverOptionsSchema, process_id: str = "webharvest"
     ) -> None:
@@ -125,50 +177,61 @@ class DriverContext(abc.ABC):
         # Process ID
         self.process_id = process_id
 
+        # Loggers by thread id
+        self._loggers: Dict[int, logging.Logger] = {}
+
         # Save driver options
         self.driver_options:DriverOptionsSchema = driver_options
-        
-        # Initialize webdriver
-        self.initialize_driver()
 
-    @cached_property
-    def logger(self) -> logging.Logger:
-        """Return the logger"""
-        return logging.getLogger(
-            f"{self.process_id}.driver-{threading.get_native_id()}"
-        )
+        # Context status of the current run
+        self.status: Optional[ContextStatusSchema] = None
 
-    @property
-    def driver(self) -> AnyWebDriver:
-        """Return the driver"""
-        if hasattr(self, "_driver"):
-            return self._driver
-        raise AttributeError("Driver not initialized")
+        # Reusable waits on the driver
+        self._waits: Dict[Tuple, WebDriverWait] = {}
 
-    @driver.setter
-    def driver(self, driver: AnyWebDriver) -> None:
-        """Set the driver"""
-        self._driver = driver
+        # Last screenshot directory created - see `screenshot_directory`
+        self._screenshot_folder: Optional[str] = None
+
+        # The webdriver is initialized lazily on first access - see `__getattr__`
+        # Once it has been quit, it is only initialized again explicitly
+        self._driver_quit = False
 
     @property
-    def status(self) -> ContextStatusSchema:
-        """Return the context status"""
-        return self.context_status
+    def logger(self) -> logging.Logger:
+        """Return the logger for the current thread.
+
+        The context may be created in one thread and run in another, so loggers are cached per thread id.
+        """
+        thread_id = threading.get_native_id()
+        logger = self._loggers.get(thread_id)
+        if logger is None:
+            logger = self._loggers[thread_id] = logging.getLogger(
+                f"{self.process_id}.driver-{thread_id}"
+            )
+        return logger
 
-    @status.setter
-    def status(self, status: ContextStatusSchema) -> None:
-        """Set the context status"""
-        self.context_status = status
+    def __getattr__(self, name: str):
+        """Initialize the driver on first access.
+
+        `driver` is a plain instance attribute so accessing it is a regular attribute lookup. This method is only
+        called when it has not been set yet. A driver that has been quit is not initialized again.
+        """
+        if name == "driver":
+            if self.__dict__.get("_driver_quit"):
+                raise AttributeError("Driver has been quit")
+            self.initialize_driver()
+            return self.__dict__["driver"]
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
 
     @property
-    def manager(self) -> DriverManager:
-        """Return the driver manager"""
-        return getattr(self, "_manager", self.create_driver_manager())
+    def has_driver(self) -> bool:
+        """Check if the driver has been initialized"""
+        return "driver" in self.__dict__
 
-    @manager.setter
-    def manager(self, manager: DriverManager) -> None:
-        """Set the driver manager"""
-        self._manager = manager
+    @cached_property
+    def manager(self) -> "DriverManager":
+        """Return the driver manager. It is created on first access."""
+        return self.create_driver_manager()
 
     def set_state(self, state_cls: Type[DriverState]) -> None:
         """Set the driver state"""
@@ -200,16 +263,39 @@ class DriverContext(abc.ABC):
         raise NotImplementedError("create_webdriver() method must be implemented")
 
     @abc.abstractmethod
-    def create_driver_manager(self) -> DriverManager:
+    def create_driver_manager(self) -> "DriverManager":
         """Create the driver manager"""
         raise NotImplementedError("create_driver_manager() method must be implemented")
 
+    def install_driver(self) -> str:
+        """Install the webdriver binary and return its path. The path is cached at class level."""
+        cls = type(self)
+        if cls._installed_path is None:
+            with cls._install_lock:
+                if cls._installed_path is None:
+                    cls._installed_path = self.manager.install()
+        return cls._installed_path
+
+    def _resize_connection_pool(self, driver: AnyWebDriver) -> None:
+        """Enlarge the urllib3 connection pool of the driver command executor.
+
+        Selenium pools a single connection per host, so concurrent commands block on it. The pool created for
+        the new session request is cleared and the next requests use a pool of `CONNECTION_POOL_MAXSIZE`.
+        """
+        connection_manager = getattr(driver.command_executor, "_conn", None)
+        if connection_manager is None:
+            return
+        connection_manager.connection_pool_kw["maxsize"] = self.CONNECTION_POOL_MAXSIZE
+        connection_manager.clear()
+
     def initialize_driver(self):
         """Re/Initialize the driver"""
         self.logger.info(
             f"Initializing driver context with PID: {threading.get_native_id()}"
         )
         self.driver = self.create_webdriver()
+        self._driver_quit = False
+        self._waits.clear()
         self.logger.info(
             f"Driver context initialized with PID: {threading.get_native_id()}"
         )
@@ -225,8 +311,9 @@ class DriverContext(abc.ABC):
 
     def run(self) -> None:
         """Run/Execute interactions using the current driver state"""
-        self.status.current_state = self.state.__class__.__name__
-        self.state.run()
+        state = self.state
+        self.status.current_state = state.__class__.__name__
+        state.run()
 
     def randomize(self):
         """Randomize user agent and viewport size of the driver"""
@@ -236,20 +323,40 @@ class DriverContext(abc.ABC):
     def change_user_agent(self):
         """Change user agent of the driver"""
         user_agent = random.choice(self.RANDOM_AGENTS)
-        self.driver.execute_script(
-            "Object.defineProperty(navigator, 'userAgent', {get: function(){return '"
-            + user_agent
-            + "';}});"
-        )
+        self.driver.execute_script(_SET_USER_AGENT_JS, user_agent)
 
     def change_viewport_size(self):
         """Change viewport size of the driver"""
         width, height = random.choice(self.RANDOM_VIEWPORTS)
         self.driver.set_window_size(width, height)
 
+    def reset_session(self) -> None:
+        """Reset the browser session so the driver can be reused by another context.
+
+        Cookies are deleted and a blank page is loaded. The driver is only reinitialized if the session was lost.
+        """
+        if not self.has_driver:
+            self.initialize_driver()
+            return
+
+        try:
+            self.driver.delete_all_cookies()
+            self.driver.get("about:blank")
+        except InvalidSessionIdException:
+            self.logger.warning("Driver session lost. Reinitializing driver...")
+            # Quit the lost session so its browser and driver service processes are not orphaned
+            try:
+                self.quit()
+            except WebDriverException:
+                self.logger.debug("Could not quit the lost driver session", exc_info=True)
+            self.initialize_driver()
+
     def quit(self):
         """Close/quit the driver"""
-        self.driver.quit()
+        self._driver_quit = True
+        if self.has_driver:
+            self.driver.quit()
+            del self.driver
 
     # Web driver actions
     # ******************
@@ -257,18 +364,31 @@ class DriverContext(abc.ABC):
         """Refresh the driver"""
         self.driver.refresh()
 
-    def take_screenshot(
-        self, filename: str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S.png")
-    ) -> bool:
-        """Take a screenshot of the driver"""
-
-        # Create screenshot folder if it doesn't exist
+    @property
+    def screenshot_directory(self) -> str:
+        """Return the screenshot directory. It is created the first time it is used, or after a config reload."""
         screenshot_folder = config.get_screenshot_directory()
-        os.makedirs(screenshot_folder, exist_ok=True)
+        if screenshot_folder != self._screenshot_folder:
+            os.makedirs(screenshot_folder, exist_ok=True)
+            self._screenshot_folder = screenshot_folder
+        return screenshot_folder
+
+    def take_screenshot(self, filename: Optional[str] = None) -> bool:
+        """Take a screenshot of the driver. The file is written in background by the screenshot writer.
+
+        Args:
+            filename (Optional[str]): Name of the file. Defaults to the current date and time.
+
+        Returns:
+            bool: True once the screenshot is queued. It does not mean the file was written - write errors are
+            logged by the screenshot writer.
+        """
+        filename = filename or datetime.now().strftime("%Y-%m-%d_%H-%M-%S.png")
 
-        # Create screenshot
-        file_path = os.path.join(screenshot_folder, filename)
-        return self.driver.get_screenshot_as_file(file_path)
+        # Capture screenshot and queue it to be written
+        file_path = os.path.join(self.screenshot_directory, filename)
+        utils.get_screenshot_writer().write(file_path, self.driver.get_screenshot_as_png())
+        return True
 
     def javascript_click(self, element: SeleniumWebElement) -> None:
         """Click on element using javascript
@@ -276,7 +396,7 @@ class DriverContext(abc.ABC):
         Args:
             element (SeleniumWebElement): Element to be clicked
         """
-        self.driver.execute_script("arguments[0].click();", element)
+        self.driver.execute_script(_CLICK_JS, element)
 
     def javascript_set_attribute(
         self, element: SeleniumWebElement, attribute: str, value: str
@@ -288,9 +408,7 @@ class DriverContext(abc.ABC):
             attribute (str): Attribute to be set
             value (str): Value to be set
         """
-        self.driver.execute_script(
-            f"arguments[0].setAttribute('{attribute}', '{value}');", element
-        )
+        self.driver.execute_script(_SET_ATTR_JS, element, attribute, value)
 
     def execute_script(self, script: str) -> None:
         """Execute javascript in the driver
@@ -310,6 +428,7 @@ class DriverContext(abc.ABC):
             StaleElementReferenceException,
         ),
         delay: int = 10,
+        poll_frequency: float = 0.1,
     ) -> Optional[SeleniumWebElement]:
         """Wait for an element to be available in the page"""
 
@@ -321,10 +440,8 @@ class DriverContext(abc.ABC):
             parent_element = self.driver
 
         try:
-            return WebDriverWait(
-                driver=parent_element,
-                timeout=delay,
-                ignored_exceptions=ignored_exceptions,
+            return self._get_wait(
+                parent_element, delay, poll_frequency, ignored_exceptions
             ).until(expected_condition)
 
         except TimeoutException:
@@ -341,6 +458,7 @@ class DriverContext(abc.ABC):
             StaleElementReferenceException,
         ),
         delay: int = 10,
+        poll_frequency: float = 0.1,
     ) -> Optional[List[SeleniumWebElement]]:
         """Wait for more than one element to be meet a condition"""
 
@@ -353,13 +471,37 @@ class DriverContext(abc.ABC):
 
         # Handle timeout exception
         try:
-            return WebDriverWait(
-                parent_element, delay, ignored_exceptions=ignored_exceptions
+            return self._get_wait(
+                parent_element, delay, poll_frequency, ignored_exceptions
             ).until(expected_condition)
         except TimeoutException:
             self.logger.debug(f"Elements {element_locator} timed out")
             return None
 
+    def _get_wait(
+        self,
+        parent_element,
+        timeout: float,
+        poll_frequency: float,
+        ignored_exceptions: Optional[Iterable[Type[WebDriverException]]],
+    ) -> WebDriverWait:
+        """Get a wait for the parent element. Waits on the driver are reused, keyed by their timing and ignored exceptions."""
+        # Any iterable is accepted, as by WebDriverWait, but the cache key must be hashable
+        ignored_exceptions = tuple(ignored_exceptions) if ignored_exceptions is not None else ()
+
+        if parent_element is not self.driver:
+            return WebDriverWait(
+                parent_element, timeout, poll_frequency=poll_frequency, ignored_exceptions=ignored_exceptions
+            )
+
+        key = (timeout, poll_frequency, ignored_exceptions)
+        wait = self._waits.get(key)
+        if wait is None:
+            wait = self._waits[key] = WebDriverWait(
+                parent_element, timeout, poll_frequency=poll_frequency, ignored_exceptions=ignored_exceptions
+            )
+        return wait
+
     # This functions waits until url is the required one
     def wait_until_url_is(self, driver, url: str, delay: int = 10):
         return WebDriverWait(driver, delay).until(EC.url_to_be(url))
@@ -385,67 +527,22 @@ class DriverContext(abc.ABC):
         """
         self.driver.switch_to.window(self.driver.window_handles[tab_index])
 
-    def _safe_textContent_getter(self, element: SeleniumWebElement) -> Optional[str]:
-        """Get text content of element safely
-
-        Args:
-            element (SeleniumWebElement): Element to get text content from
-
-        Returns:
-            Optional[str]: Text content of element or None if it doesn't exist
-        """
-        text_content = element.get_attribute("textContent")
-        if isinstance(text_content, str):
-            return text_content.strip()
-        return None
-
     def get_simple_table_data(
         self, table_element: SeleniumWebElement
     ) -> TableDataSchema:
         """Get table data from selenium tbody element )
 
+        The table is parsed in the browser with a single script execution. If the first row has no `th` cells,
+        it is considered part of the body.
+
         Args:
             table_element (SeleniumWebElement): Table element to be parsed
 
         Returns:
-            typing.Dict: Dict with table data. Headers(List[str]) and body(List[List[str]]) are keys.
+            TableDataSchema: Table data with the header (List[str]) and the body (List[List[str]]).
         """
-
-        body:TableBody = []
-
-        # Collect rows
-        table_rows = table_element.find_elements(By.XPATH, ".//tr")
-
-        # `find_elements` collects the rows in reverse order. Need to reverse it.
-        table_rows.reverse()
-
-        # Get header row - Case #0
-        header_row = table_rows.pop()
-        headers:TableHeader = [
-            self._safe_textContent_getter(cell)
-            for cell in header_row.find_elements(By.XPATH, ".//th")
-        ]
-
-        if not headers:
-            body.append(
-                [
-                    self._safe_textContent_getter(cell)
-                    for cell in header_row.find_elements(By.XPATH, ".//td")
-                ]
-            )
-
-        # Collect the rest of the rows
-        for row in table_rows:
-            body.append(
-                [
-                    self._safe_textContent_getter(cell)
-                    for cell in row.find_elements(By.XPATH, ".//td")
-                ]
-            )
-
-        # Just to have the content ordered
-        body.reverse()
-        return TableDataSchema(header=headers, body=body)
+        table_data: Dict[str, List] = self.driver.execute_script(_TABLE_DATA_JS, table_element)
+        return TableDataSchema(header=table_data["header"], body=table_data["body"])
 
     def get_simple_list_data(
         self, list_element: SeleniumWebElement
@@ -458,19 +555,7 @@ class DriverContext(abc.ABC):
         Returns:
             typing.List: List with list data.
         """
-
-        items = []
-
-        # Collect rows
-        list_items = list_element.find_elements(By.XPATH, ".//li")
-
-        # `find_elements` collects the items in reverse order. Need to reverse it.
-        list_items.reverse()
-
-        for item in list_items:
-            items.append(self._safe_textContent_getter(item))
-
-        return items
+        return self.driver.execute_script(_LIST_DATA_JS, list_element)
 
 
 class FirefoxDriverContext(DriverContext):
@@ -486,20 +571,28 @@ class FirefoxDriverContext(DriverContext):
     ]
     """List of random user agents for Firefox based Selenium"""
 
-    def create_driver_manager(self) -> DriverManager:
+    def create_driver_manager(self) -> "DriverManager":
+        from webdriver_manager.firefox import GeckoDriverManager
+
         return GeckoDriverManager()
 
-    def create_webdriver(self) -> webdriver.Firefox:
+    def create_webdriver(self) -> "webdriver.Firefox":
         """Create the Firefox webdriver"""
+        from selenium.webdriver import Firefox
+        from selenium.webdriver.firefox.service import Service as FirefoxService
 
         # Create service
-        self.service = FirefoxService(executable_path=self.manager.install())
+        self.service = FirefoxService(executable_path=self.install_driver())
 
         # Create driver
-        return webdriver.Firefox(options=self.getOptions(), service=self.service)
+        driver = Firefox(options=self.getOptions(), service=self.service)
+        self._resize_connection_pool(driver)
+        return driver
 
-    def getOptions(self) -> FirefoxOptions:
+    def getOptions(self) -> "FirefoxOptions":
         """Create options for the driver"""
+        from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
         # Create options
         firefox_options = FirefoxOptions()
 
@@ -521,21 +614,29 @@ class ChromeDriverContext(DriverContext):
     ]
     """List of random user agents for Chrome based Selenium"""
 
-    def create_driver_manager(self) -> DriverManager:
+    def create_driver_manager(self) -> "DriverManager":
         """Create the driver manager"""
+        from webdriver_manager.chrome import ChromeDriverManager
+
         return ChromeDriverManager()
 
-    def create_webdriver(self) -> webdriver.Chrome:
+    def create_webdriver(self) -> "webdriver.Chrome":
         """Generate the driver"""
+        from selenium.webdriver import Chrome
+        from selenium.webdriver.chrome.service import Service as ChromeService
 
         # Create service
-        self.service = ChromeService(self.manager.install())
+        self.service = ChromeService(self.install_driver())
 
         # Create driver
-        return webdriver.Chrome(service=self.service, options=self.getOptions())
+        driver = Chrome(service=self.service, options=self.getOptions())
+        self._resize_connection_pool(driver)
+        return driver
 
-    def getOptions(self) -> ChromeOptions:
+    def getOptions(self) -> "ChromeOptions":
         """Create options for the Chrome driver"""
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+
         # Create options
         chrome_options = ChromeOptions()
 
@@ -553,7 +654,7 @@ class ChromeDriverContext(DriverContext):
         # Return options
         return chrome_options
 
-    def _add_experimental_options(self, options: ChromeOptions) -> None:
+    def _add_experimental_options(self, options: "ChromeOptions") -> None:
         """Add experimental options to the Chrome driver"""
         preferences: Dict[str, str] = {
             "download.default_directory": config.get_download_directory(),
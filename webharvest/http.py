@@ -1,33 +1,85 @@
 import logging
-from typing import Dict
+from functools import cached_property
+from http.cookiejar import Cookie
+from typing import Dict, List, Optional
 
 import httpx
 
 from webharvest.driver import DriverContext
 from webharvest.schemas import AnyWebDriver
 
+def _to_cookiejar_cookie(cookie: Dict) -> Cookie:
+    """Convert a Selenium cookie to a cookiejar cookie, as `httpx.Cookies.set` does."""
+    domain = cookie.get("domain") or ""
+    return Cookie(
+        version=0,
+        name=cookie["name"],
+        value=cookie["value"],
+        port=None,
+        port_specified=False,
+        domain=domain,
+        domain_specified=bool(domain),
+        domain_initial_dot=domain.startswith("."),
+        path="/",
+        path_specified=True,
+        secure=False,
+        expires=None,
+        discard=True,
+        comment=None,
+        comment_url=None,
+        rest={"HttpOnly": None},
+        rfc2109=False,
+    )
+
 class SeleniumHTTPClient:
-    """Selenium HTTP client. It handles cookies and headers."""
+    """Selenium HTTP client. It handles cookies and headers.
+
+    The client must be closed after use, either with `close()` or using it as a context manager:
+
+        with SeleniumHTTPClient(driver_context) as client:
+            client.get(url)
+    """
 
-    def __init__(self, driver_context:DriverContext):
-        """Initialize selenium http client."""
+    def __init__(self, driver_context:DriverContext, user_agent:Optional[str]=None):
+        """Initialize selenium http client.
+
+        Args:
+            driver_context (DriverContext): Driver context whose cookies and user agent are used.
+            user_agent (Optional[str]): User agent of the driver, if known. Otherwise it is requested to the driver.
+        """
         self._driver_context = driver_context
+        self._user_agent = user_agent
 
         self.process_id = driver_context.process_id
-        self.logger = logging.getLogger(f'{self.process_id}.{self.__class__.__name__}')
 
         # Client preparation
         self._initialize_client()
 
-    def __del__(self):
+    def __enter__(self) -> "SeleniumHTTPClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
         """Close session."""
-        self.client.close()
+        self._client.close()
         self.logger.info("Client closed.")
 
+    @cached_property
+    def logger(self) -> logging.Logger:
+        """Return the logger"""
+        return logging.getLogger(f'{self.process_id}.{self.__class__.__name__}')
+
     @property
     def driver(self) -> AnyWebDriver:
         return self._driver_context.driver
     
+    @cached_property
+    def user_agent(self) -> str:
+        """Return the user agent of the driver. It is requested to the driver at most once."""
+        return self._user_agent or self._get_user_agent()
+
     @property
     def client(self) -> httpx.Client:
         return self._client
@@ -44,23 +96,41 @@ class SeleniumHTTPClient:
         """Open session."""
         self._initialize_headers()
         self._initialize_cookies()
-        self._client = httpx.Client(headers=self.headers, cookies=self.cookies)
+        self._client = httpx.Client(
+            headers=self.headers,
+            cookies=self.cookies,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
         self.logger.info("Client initialized.")
 
     def _initialize_headers(self) -> None:
         """Initialize headers."""
         self._headers = httpx.Headers()
-        self._headers.update({"User-Agent": self._get_user_agent()})
+        self._headers.update({"User-Agent": self.user_agent})
 
     def _initialize_cookies(self) -> None:
         """Initialize cookies."""
         self._cookies = httpx.Cookies()
-        for cookie in self.driver.get_cookies():
-            self.cookies.set(
-                name=cookie["name"],
-                value=cookie["value"],
-                domain=cookie.get("domain", None),
-            )
+        self._last_cookie_snapshot: List[Dict] = self.driver.get_cookies()
+        self._set_cookies(self._cookies.jar, self._last_cookie_snapshot)
+
+    def update_cookies(self) -> None:
+        """Copy the driver cookies to the client, replacing its cookies. The jars are only updated if the cookies changed since the last copy."""
+        cookies = self.driver.get_cookies()
+        if cookies == self._last_cookie_snapshot:
+            return
+
+        self._last_cookie_snapshot = cookies
+        self._set_cookies(self._cookies.jar, self._last_cookie_snapshot)
+        self._set_cookies(self._client.cookies.jar, self._last_cookie_snapshot)
+
+    @staticmethod
+    def _set_cookies(jar, cookies: List[Dict]) -> None:
+        """Replace the cookies of a cookie jar with Selenium cookies, so cookies deleted by the driver are dropped."""
+        jar.clear()
+        for cookie in map(_to_cookiejar_cookie, cookies):
+            jar.set_cookie(cookie)
     
     def update_headers(self, headers:Dict[str,str]) -> None:
         """Update headers."""
@@ -69,10 +139,10 @@ class SeleniumHTTPClient:
     def _get_user_agent(self) -> str:
         return self.driver.execute_script("return navigator.userAgent;")
 
-    def get(self, url:str, params:dict=dict(), **kwargs) -> httpx.Response:
+    def get(self, url:str, params:Optional[dict]=None, **kwargs) -> httpx.Response:
         """Get request."""
         return self._client.get(url, params=params, **kwargs)
     
-    def post(self, url:str, data:dict=dict(), **kwargs) -> httpx.Response:
+    def post(self, url:str, data:Optional[dict]=None, **kwargs) -> httpx.Response:
         """Post request."""
         return self._client.post(url, data=data, **kwargs)
\ No newline at end of file
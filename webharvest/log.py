@@ -1,17 +1,38 @@
-"""Module for logging"""
+"""Module for logging
+
+Records are put in a queue by the root logger handler and written to the log file and the console by a background
+listener thread, so the scraping threads do not block on log I/O.
+"""
 import os
+import queue
+import atexit
 import logging
+import logging.handlers
 
 from webharvest import config
 
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s %(name)s %(levelname)s: %(message)s', 
+formatter = logging.Formatter(
+    fmt='%(asctime)s %(name)s %(levelname)s: %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler(os.path.join(config.LOGS_DIR, 'webharvest.log')),
-        logging.StreamHandler()
-    ]
 )
 
+file_handler = logging.FileHandler(os.path.join(config.LOGS_DIR, 'webharvest.log'))
+file_handler.setFormatter(formatter)
+
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(formatter)
+
+log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+
+# The queue handler only merges the message and the traceback, the listener handlers do the formatting
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+logging.basicConfig(
+    level=logging.INFO,
+    handlers=[queue_handler]
+)
 
+listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
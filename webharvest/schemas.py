@@ -1,15 +1,18 @@
 """Module for defining schemas for the webscrapper app."""
 import enum
-from typing import Union, Optional, List, Tuple, Dict, TypeAlias, Generic, TypeVar
+from typing import Union, Optional, List, Tuple, Dict, Sequence, TypeAlias, Generic, TypeVar, TYPE_CHECKING
 
-from pydantic import BaseModel, Field, field_validator
-from selenium.webdriver import Chrome, Firefox
+from pydantic import BaseModel, ConfigDict, Field
+
+# Selenium is only needed for the webdriver type aliases
+if TYPE_CHECKING:
+    from selenium.webdriver import Chrome, Firefox
 
 # Type aliases
 WebElementLocator:TypeAlias = Tuple[str, str]
 ExpectedConditionGenerator:TypeAlias = Tuple[str, str, str]
-AnyWebDriver:TypeAlias = Union[Chrome, Firefox]
-AnyWebDriverManager:TypeAlias = Union[Chrome, Firefox]
+AnyWebDriver:TypeAlias = "Union[Chrome, Firefox]"
+AnyWebDriverManager:TypeAlias = "Union[Chrome, Firefox]"
 TableHeader:TypeAlias = List[Optional[str]]
 TableBody:TypeAlias = List[List[Optional[str]]]
 
@@ -35,20 +38,17 @@ class WebscrapperOptionsSchema(BaseModel):
     """Webscrapper options."""
     threads_num: int = Field(title='Number of threads', description="Number of threads to use for webscrapping", default=1)
 
+    # Options are immutable and never copied or revalidated when passed to other models
+    model_config = ConfigDict(frozen=True, revalidate_instances='never')
+
 class DriverOptionsSchema(BaseModel):
     """Driver options"""
     driver_type: DriverTypeEnum = Field(title='Driver type', description="Type of driver to use for webscrapping", default=DriverTypeEnum.CHROME)
-    webdriver_options: List[str] = Field(title='Webdriver options', description="Webdriver options", default_factory=list)
-    extensions: List[str] = Field(title='Extensions required', description="Extensions required for the webdriver", default_factory=list)
-
-    @field_validator('driver_type', mode='before')
-    def validate_driver_type(cls, value):
-        if isinstance(value, str):
-            try:
-                return DriverTypeEnum(value)
-            except KeyError:
-                raise KeyError(f"Invalid driver type {value}. Currently supported drivers are: {DriverTypeEnum.__members__.keys()}")
-        return value
+    webdriver_options: Sequence[str] = Field(title='Webdriver options', description="Webdriver options", default=())
+    extensions: Sequence[str] = Field(title='Extensions required', description="Extensions required for the webdriver", default=())
+
+    # Options are immutable and never copied or revalidated when passed to other models
+    model_config = ConfigDict(frozen=True, revalidate_instances='never')
 
 class ContextStatusSchema(BaseModel, Generic[InputDataT, OutputDataT]):
     """Context status schema for a webscrapping run."""
@@ -58,9 +58,21 @@ class ContextStatusSchema(BaseModel, Generic[InputDataT, OutputDataT]):
     input_data: InputDataT = Field(title='Input data', description="Input data for the webscrapping run")
     output_data: OutputDataT = Field(title='Output data', description="Output data for the webscrapping run")
     tmp_data: Dict = Field(title='Temporary data', description="Temporary data for the webscrapping run", default_factory=dict)
-    
-    class Config:
-        arbitrary_types_allowed = True
+
+    # Statuses are updated by the webscrapper - assignments are not validated
+    model_config = ConfigDict(validate_assignment=False, arbitrary_types_allowed=True)
+
+    @classmethod
+    def blank(cls, input_data: InputDataT, output_data: OutputDataT) -> 'ContextStatusSchema[InputDataT, OutputDataT]':
+        """Create a blank context status without validation. Use it for trusted input and output data."""
+        return cls.model_construct(
+            status=ContextStatusEnum.INITIALIZED,
+            error=None,
+            current_state=None,
+            input_data=input_data,
+            output_data=output_data,
+            tmp_data={},
+        )
 
 
 # Data schemas
@@ -68,4 +80,8 @@ class TableDataSchema(BaseModel):
     """Table data schema."""
     header: TableHeader = Field(title='Table header', description="Table header")
     body: TableBody = Field(title='Table body', description="Table body")
+
+    def to_json_bytes(self) -> bytes:
+        """Serialize the table to JSON bytes with the pydantic-core serializer, without building an intermediate dict."""
+        return self.__pydantic_serializer__.to_json(self)
     
\ No newline at end of file
@@ -1 +1,91 @@
-"""Utils module for webscrapper."""
\ No newline at end of file
+"""Utils module for webscrapper."""
+import os
+import queue
+import atexit
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+
+class ScreenshotWriter:
+    """Background writer for screenshot files.
+
+    Screenshots are queued as `(file_path, data)` pairs and written to disk by a single daemon thread, so the
+    scraping threads do not block on disk writes. Pending files are drained in batches of up to `max_batch`.
+    """
+
+    def __init__(self, max_batch: int = 32) -> None:
+        """Initialize the writer and start its thread."""
+        self.max_batch = max_batch
+        self.logger = logging.getLogger('webharvest.screenshot_writer')
+
+        self._queue: queue.Queue[Optional[Tuple[str, bytes]]] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='screenshot-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, file_path: str, data: bytes) -> None:
+        """Queue a file to be written."""
+        self._queue.put((file_path, data))
+
+    def flush(self) -> None:
+        """Block until every queued file has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the pending files and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Writer loop. It stops when the sentinel is received."""
+        while True:
+            batch = self._get_batch()
+            try:
+                for item in batch:
+                    if item is not None:
+                        self._write_file(*item)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if None in batch:
+                return
+
+    def _get_batch(self) -> List[Optional[Tuple[str, bytes]]]:
+        """Wait for a queued file and collect the rest of the pending ones up to `max_batch`."""
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_file(self, file_path: str, data: bytes) -> None:
+        """Write a file to disk."""
+        try:
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+        except Exception:
+            # Any error is logged, so the writer thread keeps running and `flush` never blocks forever
+            self.logger.warning(f'Could not write screenshot {file_path}', exc_info=True)
+
+
+_screenshot_writer: Optional[ScreenshotWriter] = None
+_screenshot_writer_lock = threading.Lock()
+
+def get_screenshot_writer() -> ScreenshotWriter:
+    """Get the shared screenshot writer. It is created on first use and closed at exit."""
+    global _screenshot_writer
+    if _screenshot_writer is None:
+        with _screenshot_writer_lock:
+            if _screenshot_writer is None:
+                _screenshot_writer = ScreenshotWriter()
+                atexit.register(_screenshot_writer.close)
+    return _screenshot_writer
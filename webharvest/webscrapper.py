@@ -2,30 +2,67 @@
 import os
 import sys
 import abc
+import time
 import types
 import queue
 import signal
+import weakref
 import logging
 import functools
-from datetime import datetime
-from typing import List, Dict, Type, Optional
+import threading
+import collections
+from typing import List, Type, Optional, Tuple
 
 from concurrent.futures import ThreadPoolExecutor, as_completed, Future, CancelledError
 
 # Schemas
-from webharvest.schemas import WebscrapperOptionsSchema, DriverOptionsSchema, ContextStatusSchema, ContextStatusEnum
+from webharvest.schemas import WebscrapperOptionsSchema, DriverOptionsSchema, DriverTypeEnum, ContextStatusSchema, ContextStatusEnum
 
 # Base classes
 from webharvest.driver import DriverContext, DriverState
 from webharvest.contextmanager import DriverContextManager
 from webharvest.exceptions import WebScrapperException, InvalidWebdriverException
 
+_LOGGER = logging.getLogger('webharvest.webscrapper')
+
+# Context statuses set by the webscrapper
+_FAILED = ContextStatusEnum.FAILED
+_CRITICAL = ContextStatusEnum.CRITICAL
+_CANCELLED = ContextStatusEnum.CANCELLED
+
+# Webscrappers stopped on SIGINT
+_ACTIVE_SCRAPERS: 'weakref.WeakSet[Webscrapper]' = weakref.WeakSet()
+
+def _sigint_handler(signum: int, frame: Optional[types.FrameType]) -> None:
+    """SIGINT handler. It stops every active webscrapper and exits."""
+    for webscrapper in list(_ACTIVE_SCRAPERS):
+        webscrapper.stop_signal_handler(signum, frame)
+    sys.exit(0)
+
+_sigint_handler_installed = False
+
+def _install_sigint_handler() -> None:
+    """Install the SIGINT handler once. Signal handlers can only be installed from the main thread."""
+    global _sigint_handler_installed
+    if _sigint_handler_installed or threading.current_thread() is not threading.main_thread():
+        return
+    signal.signal(signal.SIGINT, _sigint_handler)
+    _sigint_handler_installed = True
+
+@functools.lru_cache(maxsize=4)
+def _resolve_driver_cls(driver_type: DriverTypeEnum) -> Type[DriverContext]:
+    """Get the driver context class for a driver type. Cached per driver type."""
+    return DriverContext.get_driver_context_cls(driver_type)
+
 class Webscrapper(abc.ABC):
     """ Abstract class to be inherited by all Selenium based webscrappers. 
     
     This class is the base class for all Selenium based webscrappers. It handles the driver pool and the webscrapping process.
     """
 
+    logger: logging.Logger = _LOGGER
+    """Logger. It is replaced by the process logger on initialization."""
+
     def __init__(self,
                  driver_context_manager: DriverContextManager,
                  webscrapper_options: WebscrapperOptionsSchema = WebscrapperOptionsSchema(),
@@ -37,6 +74,7 @@ class Webscrapper(abc.ABC):
         # Process ID
         self.PID = os.getpid()
         self.process_id = process_id
+        self.logger = logging.getLogger(f'{self.process_id}.webscrapper')
         self.logger.info(f'Initializing webscrapper with PID: {self.PID}')
 
         # Data processor
@@ -47,12 +85,35 @@ class Webscrapper(abc.ABC):
 
         # Driver save driver options
         self.driver_options = driver_options
+        self._driver_cls = _resolve_driver_cls(self.driver_options.driver_type)
 
-        # Driver queue
-        self._driver_queue:queue.Queue[DriverContext] = queue.Queue(maxsize=self.webscrapper_options.threads_num)
-    
-        # Stop signal handler
-        signal.signal(signal.SIGINT, self.stop_signal_handler)
+        # Driver pool - available driver contexts and a semaphore counting them
+        self._drivers:collections.deque[DriverContext] = collections.deque()
+        self._driver_sem = threading.Semaphore(0)
+        self._num_drivers = 0
+
+        # Executor shared by the driver pool creation and the webscrapping runs. It is created for each run
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+        # Tasks - shards of scraping contexts and their futures, by task index
+        self._tasks:List[List[ContextStatusSchema]] = list()
+        self._task_futures:List[Optional[Future]] = list()
+
+        # Stop event - set when the pending runs are cancelled
+        self._stop_event = threading.Event()
+
+        # Completion tracking - set when every submitted task has been processed
+        self._done_event = threading.Event()
+        self._pending_tasks = 0
+        self._pending_lock = threading.Lock()
+        self._task_error: Optional[Exception] = None
+
+        # Last formatted timestamp - (second, formatted string)
+        self._last_timestamp: Tuple[int, str] = (-1, '')
+
+        # Stop on SIGINT
+        _ACTIVE_SCRAPERS.add(self)
+        _install_sigint_handler()
 
     @property
     @abc.abstractmethod
@@ -60,33 +121,31 @@ class Webscrapper(abc.ABC):
         """Initial state. This property stores the initial state of the driver context."""
         raise NotImplementedError('Initial state must be implemented in the child class')
 
-    @property
-    def driver_queue(self) -> queue.Queue[DriverContext]:
-        """Driver queue. This property stores the driver queue."""
-        return self._driver_queue
-    
-    @functools.cached_property
-    def logger(self) -> logging.Logger:
-        """Logger. This property stores the logger."""
-        return logging.getLogger(f'{self.process_id}.webscrapper')
-    
     # Driver Context Methods
     # ----------------------
 
     def initialize_driver_pool(self) -> None:
         """Initialize driver pool. This method creates the driver managers and adds them to the driver pool."""
 
-        with ThreadPoolExecutor(max_workers=self.webscrapper_options.threads_num) as executor:
-            futures = [executor.submit(self.generate_driver_context) for _ in range(self.webscrapper_options.threads_num)]
+        # Webdrivers are booted in the executor, their state is set in this thread as soon as each is ready
+        futures = [self.executor.submit(self._generate_driver_context) for _ in range(self.webscrapper_options.threads_num)]
 
         for future in as_completed(futures):
             self.setup_driver_context(future)
-        
+
     def setup_driver_context(self, future: Future) -> None:
         """Setup driver context. This method prepares the driver context for the webscrapping process and adds it to the driver pool"""
         try:
             driver_context:DriverContext = future.result()
-            self.driver_queue.put(driver_context) 
+
+            # Set initial state
+            driver_context.set_state(self.initial_state)
+
+            self._release_driver_context(driver_context)
+
+            # Drivers that booted, either available in the pool or in use by a shard. Each is counted as soon as
+            # it is pooled, so a stop signal received while the pool is booting still clears it
+            self._num_drivers += 1
 
         except InvalidWebdriverException as e:
             self.logger.error(e)
@@ -94,52 +153,54 @@ class Webscrapper(abc.ABC):
         except Exception as e:
             self.logger.error(f'Error initializing driver context: {future.exception()}', exc_info=True)
 
-    def generate_driver_context(self) -> DriverContext:
-        """ Producer method to generate driver managers and add them to the driver pool."""
-
-        # Create driver manager and retry if it fails
-        driver_context:DriverContext = self._generate_driver_context()
-
-        # Set initial state
-        driver_context.set_state(self.initial_state) 
-
-        return driver_context 
-    
     def _generate_driver_context(self) -> DriverContext:
-        """ Generate driver context. This method creates the driver manager. """
-
-        # Get driver manager class
-        driver_context_cls = DriverContext.get_driver_context_cls(self.driver_options.driver_type)
+        """ Producer method to generate driver contexts. This method creates the driver context and boots its webdriver. """
 
-        # Create driver manager
-        return driver_context_cls(driver_options=self.driver_options, process_id=self.process_id)
+        # Create driver manager and boot its webdriver
+        driver_context = self._driver_cls(driver_options=self.driver_options, process_id=self.process_id)
+        driver_context.initialize_driver()
+        return driver_context
 
     # Webscrapper Methods
     # -------------------
 
+    def initialize_run(self) -> None:
+        """Initialize run. This method resets the state of the previous run and creates the executor shared by the driver pool and the tasks."""
+        self._tasks = list()
+        self._task_futures = list()
+        self._stop_event.clear()
+        self._done_event.clear()
+        self._pending_tasks = 0
+        self._task_error = None
+        self._num_drivers = 0
+
+        self.executor = ThreadPoolExecutor(max_workers=self.webscrapper_options.threads_num, thread_name_prefix=self.process_id)
+
     def start_scraping(self) -> None:
         """This method starts the scraping process.
             1. Creates the initial context statuses for webscrapping runs.
-            2. Create driver pool.
+            2. Create executor and driver pool.
             3. Submits the tasks to the executor
             4. Processes the results.
-            5. Clears the driver pool and flushes pending data.
+            5. Shuts down the executor, clears the driver pool and flushes pending data.
             6. Creates a report when all futures are completed.
         """
 
         # 1. Create scraping contexts - create blank context statuses
         self.scraping_contexts:List[ContextStatusSchema] = self.generate_scraping_contexts()
 
-        # 2. Create driver pool
+        # 2. Create executor and driver pool
+        self.initialize_run()
         self.initialize_driver_pool()
 
-        # 3. Submit tasks - create futures and save them in a dictionary
+        # 3. Submit tasks - create futures and save them by task index
         self.create_and_submit_tasks()
 
         # 4. Process tasks results
         self.process_completed_tasks()
 
-        # 5. Clean driver pool and flush pending data
+        # 5. Shut down executor, clean driver pool and flush pending data
+        self.executor.shutdown(wait=True)
         self.clear_driver_queue()
         self.driver_context_manager.stop_processing()
 
@@ -157,98 +218,191 @@ class Webscrapper(abc.ABC):
             raise e
         
     def create_and_submit_tasks(self) -> None:
-        """Create and submit tasks. This method creates and submits the tasks to the executor."""
-
-        with ThreadPoolExecutor(max_workers=self.webscrapper_options.threads_num) as self.executor:
-            self.futures:Dict[Future, ContextStatusSchema] = {
-                self.executor.submit(self.scrape_item, input_item): input_item 
-                for input_item in self.scraping_contexts
-            }
+        """Create and submit tasks. This method splits the scraping contexts in one shard per booted driver (round-robin) and submits each shard to the executor."""
+
+        # Drivers that failed to boot get no shard, so every shard has a driver available
+        shards_num = self._num_drivers
+        if not shards_num:
+            self.logger.error('No driver context available. Webscrapping runs cancelled.')
+            self._stop_event.set()
+            shards_num = 1
+
+        shards = [self.scraping_contexts[idx::shards_num] for idx in range(shards_num)]
+        self._tasks = [shard for shard in shards if shard]
+        self._task_futures = [None] * len(self._tasks)
+
+        # Results are processed by callbacks as soon as each task is done
+        self._pending_tasks = len(self._tasks)
+        if not self._pending_tasks:
+            self._done_event.set()
+
+        for task_index, shard in enumerate(self._tasks):
+            future = self._task_futures[task_index] = self._submit_shard(shard)
+            future.add_done_callback(functools.partial(self._on_task_done, task_index))
+
+    def _submit_shard(self, shard: List[ContextStatusSchema]) -> Future:
+        """Submit a shard to the executor. If the runs have been cancelled, a cancelled future is returned instead, so its callback sets the shard to cancelled."""
+        if not self._stop_event.is_set():
+            try:
+                return self.executor.submit(self.scrape_shard, shard)
+            except RuntimeError:
+                # The executor was shut down by `cancel_futures` meanwhile
+                pass
+
+        future: Future = Future()
+        future.cancel()
+        return future
         
     def process_completed_tasks(self) -> None:
-        """Process completed tasks."""
+        """Process completed tasks. This method waits until the callbacks have processed every task."""
 
-        for future in as_completed(self.futures.keys()):
-            context_status:ContextStatusSchema = self.process_completed_future(future)
-            self.driver_context_manager.add_context_status(context_status)
+        self._done_event.wait()
+        if self._task_error is not None:
+            raise self._task_error
         
-        self.logger.info(f'Executed {len(self.futures)} webscrapping runs.')
-
-    def process_completed_future(self, future: Future) -> ContextStatusSchema:
-        """Get future results. This method evaluates the future result and update the context status."""
+        self.logger.info(f'Executed {len(self.scraping_contexts)} webscrapping runs.')
 
+    def _on_task_done(self, task_index: int, future: Future) -> None:
+        """Task done callback. It adds the context statuses of the task to the driver context manager."""
         try:
+            context_statuses = self.process_completed_future(future, task_index)
+            add_context_status = self.driver_context_manager.add_context_status
+            with self.driver_context_manager.lock:
+                for context_status in context_statuses:
+                    add_context_status(context_status)
 
-            context_status:ContextStatusSchema = future.result()
+        except Exception as e:
+            self.logger.error(f'Error processing task: {e}', exc_info=True)
+            self._task_error = self._task_error or e
 
-            # Expected error - set status to failed but continue scraping
-            if isinstance(context_status.error, WebScrapperException):  
-                context_status.status = ContextStatusEnum.FAILED
+        finally:
+            with self._pending_lock:
+                self._pending_tasks -= 1
+                if not self._pending_tasks:
+                    self._done_event.set()
 
-            # Unexpected error - set status to critical to stop scraping
-            elif isinstance(context_status.error, Exception):
-                context_status.status = ContextStatusEnum.CRITICAL
-                self.cancel_futures()
-            
-            return context_status
+    def process_completed_future(self, future: Future, task_index: int) -> List[ContextStatusSchema]:
+        """Get future results. This method returns the context statuses of the shard. If the shard was cancelled before running, all of them are set to cancelled."""
+
+        try:
+            return future.result()
         
         except CancelledError:
-            self.futures[future].status = ContextStatusEnum.CANCELLED
-            return self.futures[future]
-        
+            shard = self._tasks[task_index]
+            for context_status in shard:
+                context_status.status = _CANCELLED
+            return shard
 
-    def scrape_item(self, blank_context_status: ContextStatusSchema) -> ContextStatusSchema:
-        """Execute run for the given ticket. This method executes the run method of the driver context."""
+    def scrape_shard(self, shard: List[ContextStatusSchema]) -> List[ContextStatusSchema]:
+        """Execute the runs of a shard. The driver context is locked once for the whole shard. Once the pending runs are cancelled, the rest of the shard is set to cancelled."""
 
         # 1. Get & lock available driver
-        driver_context: DriverContext = self.driver_queue.get(block=True, timeout=60)
+        driver_context: DriverContext = self._acquire_driver_context(timeout=60)
+
+        # 2. Run every context of the shard
+        try:
+            is_stopped, scrape_item, evaluate_context_status = self._stop_event.is_set, self.scrape_item, self.evaluate_context_status
+            for context_status in shard:
+                if is_stopped():
+                    context_status.status = _CANCELLED
+                    continue
+
+                evaluate_context_status(scrape_item(driver_context, context_status))
 
-        # 2. Initialize driver context status
+        # 3. Always release driver
+        finally:
+            self._release_driver_context(driver_context)
+
+        return shard
+
+    def evaluate_context_status(self, context_status: ContextStatusSchema) -> None:
+        """Evaluate the context status of a finished run and update it."""
+        error = context_status.error
+
+        # No error - the common case, nothing to update
+        if error is None:
+            return
+
+        # Expected error - set status to failed but continue scraping
+        if isinstance(error, WebScrapperException):  
+            context_status.status = _FAILED
+
+        # Unexpected error - set status to critical to stop scraping
+        elif isinstance(error, Exception):
+            context_status.status = _CRITICAL
+            self.cancel_futures()
+
+    def scrape_item(self, driver_context: DriverContext, blank_context_status: ContextStatusSchema) -> ContextStatusSchema:
+        """Execute run for the given ticket. This method executes the run method of the driver context."""
+
+        # 1. Initialize driver context status
         driver_context.status = blank_context_status
 
-        # 3. Run webscrapping process until it finishes or an exception is raised
+        # 2. Run webscrapping process until it finishes or an exception is raised
         try:
-            while not driver_context.has_finished():
-                driver_context.run()
+            has_finished, run = driver_context.has_finished, driver_context.run
+            while not has_finished():
+                run()
 
-        # 3.1. Handle exceptions
+        # 2.1. Handle exceptions
         except WebScrapperException as e:
             driver_context.status.error = e
-            self.logger.error(f'[{driver_context.status.current_state}] {e}')
+            self.logger.error('[%s] %s', driver_context.status.current_state, e)
 
         except Exception as e:
             driver_context.status.error = e
-            self.logger.error(f'[{driver_context.status.current_state}] {e}', exc_info=True)
+            self.logger.error('[%s] %s', driver_context.status.current_state, e, exc_info=True)
+            # The page is captured before the driver moves on, the file is written in background
             self._take_screenshot(driver_context)
-        
-        # 3.2. Always release driver
-        finally:
-            self.driver_queue.put(driver_context)
-            self.driver_queue.task_done()
                        
         return driver_context.status
     
     # Helper Methods
     # --------------
 
+    def _acquire_driver_context(self, timeout: Optional[float] = None) -> DriverContext:
+        """Take an available driver context from the pool. Raises `queue.Empty` if none is available in time."""
+        if not self._driver_sem.acquire(timeout=timeout):
+            raise queue.Empty('No driver context available')
+        return self._drivers.popleft()
+
+    def _release_driver_context(self, driver_context: DriverContext) -> None:
+        """Give back a driver context to the pool."""
+        self._drivers.append(driver_context)
+        self._driver_sem.release()
+
     def _take_screenshot(self, driver_context: DriverContext) -> None:
         """Take screenshot if driver is available. This method takes a screenshot if the driver is available."""
         try:
-            current_time = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-            driver_context.take_screenshot(f'{driver_context.status.current_state}_error-{current_time}.png')
+            driver_context.take_screenshot(f'{driver_context.status.current_state}_error-{self._timestamp()}.png')
         except Exception as e:
             self.logger.warning('Could not take screenshot', exc_info=True)
             
+    def _timestamp(self) -> str:
+        """Current local time formatted for filenames. The string is only formatted again when the second changes."""
+        second = int(time.time())
+        last_second, timestamp = self._last_timestamp
+        if second != last_second:
+            timestamp = time.strftime('%Y-%m-%d_%H-%M-%S', time.localtime(second))
+            self._last_timestamp = (second, timestamp)
+        return timestamp
+
     def cancel_futures(self) -> None:
-        """Cancel futures. This method cancels all pending futures."""
-        for future in self.futures.keys():
+        """Cancel futures. This method cancels all pending futures and stops the running shards."""
+        self._stop_event.set()
+
+        # Cancel the queued work items of the executor at once, then any other pending future
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        pending = [future for future in self._task_futures if future is not None and not future.done()]
+        for future in pending:
             future.cancel()
 
     def clear_driver_queue(self) -> None:
         """Clear driver queue."""
 
         self.logger.info('Initializing driver queue clearance...')
-        num_drivers = self.webscrapper_options.threads_num
+        num_drivers = self._num_drivers
 
         for idx in range(num_drivers):
             try:
@@ -258,16 +412,15 @@ class Webscrapper(abc.ABC):
                 break
     
     def _clear_driver_context(self, driver_index:int) -> None:
-        """Clear driver context."""
-        driver_context = self.driver_queue.get(timeout=1000)
+        """Clear driver context. Running shards give back their driver once they are stopped, so it waits for them up to a minute."""
+        driver_context = self._acquire_driver_context(timeout=60)
+        self._num_drivers -= 1
         driver_context.clear_context()
-        self.driver_queue.task_done()
         self.logger.info(f'Driver {driver_index} cleared.')
 
     def stop_signal_handler(self, signum:int, frame:Optional[types.FrameType]) -> None:
-        """Stop signal handler."""
+        """Stop signal handler. It is called for every active webscrapper when SIGINT is received, before exiting."""
         self.logger.warning('SIGINT received, indicating threads to stop...')
         self.cancel_futures()
         self.clear_driver_queue()
         self.driver_context_manager.stop_handler()
-        sys.exit(0)